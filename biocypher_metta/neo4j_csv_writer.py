@@ -1,17 +1,394 @@
 from collections import Counter, defaultdict
+import asyncio
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
 import json
-import csv
+import os
+import queue
+import re
+import sys
+import threading
 from biocypher._logger import logger
 import networkx as nx
 import rdflib
-from pathlib import Path
 from biocypher_metta import BaseWriter
 
+ARRAY_DELIMITER = ';'
+# CSV output is assembled in memory and handed to the kernel in blocks of this size
+WRITE_BUFFER_SIZE = 8 * 1024 * 1024
+# Spilled rows are read back and decoded this many at a time
+READ_BATCH_SIZE = 4096
+
+NODE_CYPHER_TEMPLATE = """
+CREATE CONSTRAINT IF NOT EXISTS FOR (n:{label}) REQUIRE n.id IS UNIQUE;
+
+CALL apoc.periodic.iterate(
+    "LOAD CSV WITH HEADERS FROM 'file:///{absolute_path}' AS row FIELDTERMINATOR '{delimiter}' RETURN row",
+    "MERGE (n:{label} {{id: row.id}})
+    SET n += apoc.map.removeKeys(row, ['id']){array_assignments}",
+    {{batchSize:1000, parallel:true, concurrency:4}}
+)
+YIELD batches, total
+RETURN batches, total;
+"""
+
+EDGE_CYPHER_TEMPLATE = """
+CALL apoc.periodic.iterate(
+    "LOAD CSV WITH HEADERS FROM 'file:///{absolute_path}' AS row FIELDTERMINATOR '{delimiter}' RETURN row",
+    "MATCH (source:{source_type} {{id: row.source_id}})
+    MATCH (target:{target_type} {{id: row.target_id}})
+    MERGE (source)-[r:{edge_label}]->(target)
+    SET r += apoc.map.removeKeys(row, ['source_id', 'target_id', 'label', 'source_type', 'target_type']){array_assignments}",
+    {{batchSize:1000}}
+)
+YIELD batches, total
+RETURN batches, total;
+"""
+
+
+def _preprocess_str(value, translation_table):
+    value = value.translate(translation_table)
+    # Strip CURIE prefixes from property values
+    if ':' in value and not value.startswith('http'):
+        _, local_part = value.split(':', 1)
+        value = local_part.strip()
+    return value
+
+
+def _preprocess_literal(value, translation_table):
+    return str(value).translate(translation_table)
+
+
+def _is_flat_list(value):
+    return all(type(item) in _ARRAY_ITEM_TYPES for item in value)
+
+
+def _preprocess_list(value, translation_table):
+    # Flat lists of scalars are written as ARRAY_DELIMITER separated strings
+    # (the delimiter is stripped from the items) and split back in the Cypher
+    # query; anything nested falls back to JSON
+    if _is_flat_list(value):
+        return ARRAY_DELIMITER.join([str(_preprocess_value(item, translation_table)) for item in value])
+    return _preprocess_json_list(value, translation_table)
+
+
+def _preprocess_json_list(value, translation_table):
+    return json.dumps([
+        _preprocess_json_list(item, translation_table) if type(item) is list
+        else _preprocess_value(item, translation_table)
+        for item in value
+    ]).replace('\\"', '"')
+
+
+_ARRAY_ITEM_TYPES = {str, rdflib.term.Literal, int, float, bool}
+
+_PREPROCESSORS = {
+    str: _preprocess_str,
+    rdflib.term.Literal: _preprocess_literal,
+    list: _preprocess_list,
+}
+
+
+def _preprocess_value(value, translation_table):
+    """Clean a property value for CSV output, dispatching on its exact type."""
+    preprocess = _PREPROCESSORS.get(type(value))
+    return preprocess(value, translation_table) if preprocess else value
+
+
+def _clean_id(prev_id, keep_prefix):
+    """Normalise an ID string."""
+    if ':' in prev_id:
+        prefix, local_id = prev_id.split(':', 1)
+
+        if keep_prefix:
+            return f"{prefix.strip().upper()}_{local_id.strip().replace(' ', '_').upper()}"
+        return local_id.strip().replace(' ', '_').upper()
+
+    return prev_id.strip().replace(' ', '_').upper()
+
+
+def _format_field(value, needs_quoting):
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        value = str(value)
+    if needs_quoting(value):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def _bytes_translation(translation_table):
+    """
+    Return the (table, delete) arguments for bytes.translate equivalent to a
+    str.maketrans table, or None if it maps anything outside ASCII. Translating
+    UTF-8 bytes is then safe, as multi-byte sequences never contain ASCII bytes.
+    """
+    source, target, delete = bytearray(), bytearray(), bytearray()
+    for char, replacement in translation_table.items():
+        if isinstance(replacement, int):
+            replacement = chr(replacement)
+        if char >= 128 or (replacement and (len(replacement) != 1 or ord(replacement) >= 128)):
+            return None
+        if replacement:
+            source.append(char)
+            target.append(ord(replacement))
+        else:
+            delete.append(char)
+    return bytes.maketrans(bytes(source), bytes(target)), bytes(delete)
+
+
+def _make_row_builder(delimiter, translation_table, json_columns=frozenset()):
+    """
+    Return build_row(values), which preprocesses, formats and joins one row
+    into UTF-8 bytes, and build_header(headers), which formats the header line.
+    build_row is the per-cell hot loop, so each value costs a single dispatch
+    on its type: numbers and booleans are formatted straight to bytes since
+    they can never need quoting, and strings are encoded once and sanitised
+    with bytes.translate. Lists and anything else take the str path, except
+    that lists in the json_columns positions are JSON encoded even when flat.
+    """
+    quoting_pattern = f'[{re.escape(delimiter)}"\\r\\n]'
+    needs_quoting = re.compile(quoting_pattern).search
+    needs_quoting_bytes = re.compile(quoting_pattern.encode('utf-8')).search
+    byte_translation = _bytes_translation(translation_table)
+
+    if byte_translation is not None:
+        byte_table, byte_delete = byte_translation
+
+        def str_field(value):
+            value = value.encode('utf-8').translate(byte_table, byte_delete)
+            # Strip CURIE prefixes as _preprocess_str does; str.strip also
+            # knows the non-ASCII spaces, and these values are the minority
+            if b':' in value and not value.startswith(b'http'):
+                value = value.split(b':', 1)[1].decode('utf-8').strip().encode('utf-8')
+            return b'"' + value.replace(b'"', b'""') + b'"' if needs_quoting_bytes(value) else value
+    else:
+        def str_field(value):
+            return _format_field(_preprocess_str(value, translation_table), needs_quoting).encode('utf-8')
+
+    def other_field(value):
+        return _format_field(_preprocess_value(value, translation_table), needs_quoting).encode('utf-8')
+
+    formatters = {
+        str: str_field,
+        int: b'%d'.__mod__,
+        float: b'%r'.__mod__,
+        bool: {True: b'True', False: b'False'}.__getitem__,
+        type(None): lambda value: b'',
+    }
+    get_formatter = formatters.get
+    delimiter_bytes = delimiter.encode('utf-8')
+
+    if json_columns:
+        def json_list_field(value):
+            return _format_field(_preprocess_json_list(value, translation_table), needs_quoting).encode('utf-8')
+
+        def build_row(values):
+            return delimiter_bytes.join([
+                json_list_field(v) if type(v) is list and i in json_columns else get_formatter(type(v), other_field)(v)
+                for i, v in enumerate(values)
+            ])
+    else:
+        def build_row(values):
+            return delimiter_bytes.join([get_formatter(type(v), other_field)(v) for v in values])
+
+    def build_header(headers):
+        return (delimiter.join([_format_field(h, needs_quoting) for h in headers]) + '\n').encode('utf-8')
+
+    return build_row, build_header
+
+
+def _write_all(fd, data):
+    """os.write until all of data is on disk; a single call may write less."""
+    with memoryview(data) as view:
+        written = 0
+        while written < len(view):
+            written += os.write(fd, view[written:])
+
+
+class _FdWriter:
+    """
+    Writes blocks to a raw file descriptor. With background=True the blocks are
+    handed to a thread instead, so the write syscalls (which release the GIL)
+    overlap with formatting the next block; at most max_pending blocks wait in
+    the queue.
+    """
+
+    def __init__(self, fd, background=False, max_pending=2):
+        self.fd = fd
+        self._error = None
+        self._queue = None
+        self._thread = None
+        if background:
+            self._queue = queue.Queue(maxsize=max_pending)
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            # Keep draining after a failure so the producer never blocks on put
+            if self._error is None:
+                try:
+                    _write_all(self.fd, data)
+                except OSError as e:
+                    self._error = e
+
+    def write(self, data):
+        if self._thread is None:
+            _write_all(self.fd, data)
+            return
+        if self._error is not None:
+            raise self._error
+        self._queue.put(data)
+
+    def close(self, raise_error=True):
+        """
+        Wait for the pending blocks. A failed background write is raised unless
+        raise_error is False, for when another exception is already on its way.
+        """
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        if raise_error and self._error is not None:
+            raise self._error
+
+
+def _row_getter(headers, id_columns, layout, constants):
+    """
+    Build a getter pulling the header-ordered values out of a spilled row, which
+    is [layout index, *id values, *property values] with [None, *constant
+    values] appended. Properties win over id columns and constants of the same
+    name, as when the row was a merged dict.
+    """
+    positions = {name: i for i, name in enumerate((*id_columns, *layout), 1)}
+    missing = len(id_columns) + len(layout) + 1
+    for i, name in enumerate(constants, missing + 1):
+        positions.setdefault(name, i)
+    getter = itemgetter(*[positions.get(h, missing) for h in headers])
+    return getter if len(headers) > 1 else lambda row: (getter(row),)
+
+
+def _spilled_rows(temp_path, getters, tail):
+    """Yield the header-ordered values of each row spilled to temp_path."""
+    if temp_path is None or not os.path.exists(temp_path):
+        return
+    with open(temp_path, 'r') as temp_f:
+        # One json.loads per batch of lines rather than per line
+        for lines in iter(lambda: list(islice(temp_f, READ_BATCH_SIZE)), []):
+            for row in json.loads(f"[{','.join(lines)}]"):
+                row += tail
+                yield getters[row[0]](row)
+
+
+def _write_lines(csv_path, header, lines, overlap_io):
+    """Write header and then each line to csv_path in WRITE_BUFFER_SIZE blocks."""
+    buf = bytearray(header)
+    fd = os.open(csv_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        writer = _FdWriter(fd, background=overlap_io)
+        try:
+            for line in lines:
+                buf += line
+                buf += b'\n'
+                if len(buf) >= WRITE_BUFFER_SIZE:
+                    # A fresh buffer, as the full one may still be in flight
+                    writer.write(buf)
+                    buf = bytearray()
+            writer.write(buf)
+        except BaseException:
+            writer.close(raise_error=False)
+            raise
+        writer.close()
+    finally:
+        os.close(fd)
+
+
+def _mixed_columns(rows, candidates):
+    """Return the candidate column indices holding a non-empty value that is not a flat list."""
+    mixed = set()
+    for values in rows:
+        for i in candidates - mixed:
+            value = values[i]
+            if not _is_flat_list(value) if type(value) is list else value not in (None, ''):
+                mixed.add(i)
+    return mixed
+
+
+def _write_label_csv(temp_path, csv_path, headers, id_columns, layouts, constants,
+                     delimiter, translation_table, overlap_io=False):
+    """
+    Write the rows spilled to temp_path for a single label into csv_path.
+    Kept at module level so it can be shipped to a worker process. Returns the
+    headers of the columns that hold ARRAY_DELIMITER separated lists.
+
+    The Cypher query splits every value of such a column, so a column only
+    qualifies if all of its non-empty values are flat lists. The type
+    signatures of the rows flag the columns that may also hold something else;
+    if any really do, the file is written again with the lists in those
+    columns JSON encoded, as nested lists are.
+    """
+    getters = [_row_getter(headers, id_columns, layout, constants) for layout in layouts]
+    tail = [None, *constants.values()]
+    build_row, build_header = _make_row_builder(delimiter, translation_table)
+    list_columns = set()
+    nested_columns = set()
+    signatures = set()
+
+    def track(rows):
+        for values in rows:
+            signature = tuple(map(type, values))
+            if list in signature:
+                for i, value in enumerate(values):
+                    if type(value) is list:
+                        (list_columns if _is_flat_list(value) else nested_columns).add(i)
+            signatures.add(signature)
+            yield values
+
+    header = build_header(headers)
+    _write_lines(csv_path, header, map(build_row, track(_spilled_rows(temp_path, getters, tail))), overlap_io)
+
+    # A str in the signature may still be empty, so candidates get an exact check
+    candidates = {
+        i for i in list_columns
+        if i in nested_columns or any(s[i] is not list and s[i] is not type(None) for s in signatures)
+    }
+    mixed = _mixed_columns(_spilled_rows(temp_path, getters, tail), candidates) if candidates else set()
+    if mixed:
+        logger.warning(f"Columns {sorted(headers[i] for i in mixed)} of {csv_path} mix lists with other "
+                       f"values; writing their lists as JSON rather than splitting them")
+        build_row = _make_row_builder(delimiter, translation_table, json_columns=mixed)[0]
+        _write_lines(csv_path, header, map(build_row, _spilled_rows(temp_path, getters, tail)), overlap_io)
+    return sorted(headers[i] for i in list_columns - mixed)
+
+
+_worker_settings = None
+
+
+def _init_csv_worker(delimiter, translation_table, overlap_io):
+    """Process pool initializer: receive the writer settings once per worker."""
+    global _worker_settings
+    _worker_settings = (delimiter, translation_table, overlap_io)
+
+
+def _write_label_csv_in_worker(temp_path, csv_path, headers, id_columns, layouts, constants):
+    return _write_label_csv(temp_path, csv_path, headers, id_columns, layouts, constants, *_worker_settings)
+
+
 class Neo4jCSVWriter(BaseWriter):
-    def __init__(self, schema_config, biocypher_config, output_dir, include_curie: bool = False):
+    def __init__(self, schema_config, biocypher_config, output_dir, include_curie: bool = False,
+                 overlap_io: bool = False, async_io: bool = False):
         super().__init__(schema_config, biocypher_config, output_dir, include_curie=include_curie)
+        self.overlap_io = overlap_io
+        self.async_io = async_io
         self.csv_delimiter = '|'
-        self.array_delimiter = ';'
+        self.array_delimiter = ARRAY_DELIMITER
         self.translation_table = str.maketrans({
             self.csv_delimiter: '',
             self.array_delimiter: ' ',
@@ -22,13 +399,20 @@ class Neo4jCSVWriter(BaseWriter):
         self.label_is_ontology = self._build_label_types_map()
 
         self.create_edge_types()
+        # Everything needed from the schema has been extracted by now; drop the
+        # BioCypher instance and its ontology so they can be freed while writing
+        self.bcy = None
+        self.ontology = None
         self._node_writers = {}
         self._edge_writers = {}
         self._node_headers = defaultdict(set)
         self._edge_headers = defaultdict(set)
+        self._node_layouts = defaultdict(dict)
+        self._edge_layouts = defaultdict(dict)
         self._temp_files = {}
-        self.batch_size = 10000
-        self.temp_buffer = defaultdict(list)
+        # Memoised per (ID, label) because the same source and target IDs come
+        # up again and again across the edges of an adapter
+        self._cached_id = lru_cache(maxsize=1 << 20, typed=True)(self._clean_label_id)
 
 
     def _build_label_types_map(self):
@@ -97,18 +481,7 @@ class Neo4jCSVWriter(BaseWriter):
 
 
     def preprocess_value(self, value, key=None):
-        value_type = type(value)
-        if value_type is list:
-            return json.dumps([self.preprocess_value(item, key) for item in value]).replace('\\"', '"')
-        if value_type is rdflib.term.Literal:
-            value = str(value).translate(self.translation_table)
-        elif value_type is str:
-            value = value.translate(self.translation_table)
-            # Strip CURIE prefixes from property values
-            if ':' in value and not value.startswith('http'):
-                _, local_part = value.split(':', 1)
-                value = local_part.strip()        
-        return value
+        return _preprocess_value(value, self.translation_table)
 
     def normalize_text(self, label, replace_char="_", lowercase=True):
         if isinstance(label, list):
@@ -124,116 +497,201 @@ class Neo4jCSVWriter(BaseWriter):
         """
         Clean ID, preserving CURIE prefixes for ontology terms or when include_curie is True.
         """
-        prev_id = str(prev_id)
-
-        if ':' in prev_id:
-            prefix, local_id = prev_id.split(':', 1)
-
-            if (label and self._is_ontology_label(label)) or self.include_curie:
-                clean_id = f"{prefix.strip().upper()}_{local_id.strip().replace(' ', '_').upper()}"
-                return clean_id
-            else:
-                return local_id.strip().replace(' ', '_').upper()
-
-        return prev_id.strip().replace(' ', '_').upper()
-
-    def _write_buffer_to_temp(self, label_or_key, buffer):
-        if buffer and label_or_key in self._temp_files:
-            with open(self._temp_files[label_or_key], 'a') as f:
-                for entry in buffer:
-                    json.dump(entry, f)
-                    f.write('\n')
-            buffer.clear()
-
-    def _init_node_writer(self, label, properties, path_prefix=None, adapter_name=None):
-        output_dir = self.get_output_path(path_prefix, adapter_name)
-        self._node_headers[label].update(properties.keys())
-        self._node_headers[label].add('id')
-        
-        if label not in self._temp_files:
-            temp_file_path = output_dir / f"temp_nodes_{label}.jsonl"
-            if temp_file_path.exists():
-                temp_file_path.unlink()
-            self._temp_files[label] = temp_file_path
-        return label
-
-    def _init_edge_writer(self, label, source_type, target_type, properties, path_prefix=None, adapter_name=None):
-        output_dir = self.get_output_path(path_prefix, adapter_name)
-        key = (label, source_type, target_type)
-        self._edge_headers[key].update(properties.keys())
-        self._edge_headers[key].update({'source_id', 'target_id', 'label', 'source_type', 'target_type'})
-        
-        if key not in self._temp_files:
-            temp_file_path = output_dir / f"temp_edges_{label}_{source_type}_{target_type}.jsonl"
-            if temp_file_path.exists():
-                temp_file_path.unlink()
+        return self._cached_id(prev_id, label)
+
+    def _clean_label_id(self, prev_id, label):
+        keep_prefix = self.include_curie or self._is_ontology_label(label)
+        return _clean_id(str(prev_id), keep_prefix)
+
+    def _close_writers(self, writers):
+        for handle in writers.values():
+            handle.close()
+        writers.clear()
+
+    def write_to_csv(self, temp_path, csv_path, headers, id_columns, layouts, constants):
+        """
+        Write the rows spilled to temp_path into a single CSV file. Rows are
+        joined directly and written to the file descriptor in WRITE_BUFFER_SIZE
+        blocks. Returns the headers of the list-valued columns.
+        """
+        return _write_label_csv(temp_path, csv_path, headers, id_columns, layouts, constants,
+                                self.csv_delimiter, self.translation_table, self.overlap_io)
+
+    def write_csv_files(self, jobs):
+        """
+        Write one job per label; a job holds the write_to_csv arguments. Each
+        label is an independent file, so with more than one label they are
+        spread over a process pool, one task per file, or over asyncio tasks
+        when async_io is set. Returns the list-valued columns of each file,
+        keyed by csv_path.
+        """
+        if self.async_io and len(jobs) > 1:
+            return asyncio.run(self._write_csv_files_async(jobs))
+
+        max_workers = min(os.cpu_count() or 1, len(jobs))
+        if max_workers < 2:
+            return {job[1]: self.write_to_csv(*job) for job in jobs}
+
+        array_columns = {}
+        with self._csv_executor(max_workers) as executor:
+            futures = {executor.submit(_write_label_csv_in_worker, *job): job[1] for job in jobs}
+            for future in as_completed(futures):
+                array_columns[futures[future]] = future.result()
+        return array_columns
+
+    def _csv_executor(self, max_workers):
+        settings = (self.csv_delimiter, self.translation_table, self.overlap_io)
+        return ProcessPoolExecutor(max_workers=max_workers, initializer=_init_csv_worker, initargs=settings)
+
+    def _submit_csv_job(self, executor, job):
+        """Start a write_to_csv job on executor, or run it right away if there is none."""
+        if executor is not None:
+            return executor.submit(_write_label_csv_in_worker, *job)
+        future = Future()
+        future.set_result(self.write_to_csv(*job))
+        return future
+
+    async def _write_csv_files_async(self, jobs):
+        """
+        Write the jobs from threads driven by asyncio. Suits adapters that emit
+        many small files, where the time goes on disk latency rather than on
+        formatting rows and a process pool costs more than it saves.
+        """
+        semaphore = asyncio.Semaphore(min(32, len(jobs)))
+
+        async def write(job):
+            async with semaphore:
+                return job[1], await asyncio.to_thread(self.write_to_csv, *job)
+
+        return dict(await asyncio.gather(*[write(job) for job in jobs]))
+
+    def _layout_index(self, layouts, headers, properties):
+        """
+        Spilled rows carry property values by position rather than as a dict.
+        Return the index of the key layout of properties, registering the
+        layout and its keys as headers the first time it is seen.
+        """
+        layout = tuple(properties)
+        index = layouts.get(layout)
+        if index is None:
+            index = layouts[layout] = len(layouts)
+            headers.update(layout)
+        return index
+
+    def _init_node_writer(self, label, output_dir):
+        """
+        Return the open temp file handle for label, opening it on first use or
+        reopening it for appending if it was closed early.
+        """
+        handle = self._node_writers.get(label)
+        if handle is None:
+            temp_file_path = self._temp_files.get(label)
+            mode = 'a'
+            if temp_file_path is None:
+                self._node_headers[label].add('id')
+                temp_file_path = self._temp_files[label] = f"{output_dir}/temp_nodes_{label}.jsonl"
+                mode = 'w'
+            handle = self._node_writers[label] = open(temp_file_path, mode, buffering=1 << 20)
+        return handle
+
+    def _node_csv_job(self, label, output_dir):
+        return (self._temp_files.get(label), f"{output_dir}/nodes_{label}.csv", sorted(self._node_headers[label]),
+                ('id',), list(self._node_layouts[label]), {})
+
+    def _init_edge_writer(self, key, output_dir):
+        """Return the open temp file handle for key, opening it on first use."""
+        handle = self._edge_writers.get(key)
+        if handle is None:
+            label, source_type, target_type = key
+            self._edge_headers[key].update({'source_id', 'target_id', 'label', 'source_type', 'target_type'})
+            temp_file_path = f"{output_dir}/temp_edges_{label}_{source_type}_{target_type}.jsonl"
             self._temp_files[key] = temp_file_path
-        return key
+            handle = self._edge_writers[key] = open(temp_file_path, 'w', buffering=1 << 20)
+        return handle
 
     def write_nodes(self, nodes, path_prefix=None, adapter_name=None):
-        self.temp_buffer.clear()
+        return self._write_nodes(nodes, path_prefix, adapter_name, grouped=False)
+
+    def write_nodes_sorted(self, nodes, path_prefix=None, adapter_name=None):
+        """
+        Write nodes that arrive grouped by label, i.e. every node of a label in
+        one contiguous run, as most adapters emit them. When a run ends its temp
+        file is closed and its CSV written straight away (in the process pool
+        when there is more than one CPU) while the next run streams in, so only
+        one temp file is open at a time. Input that turns out not to be grouped
+        still comes out right: once a label shows up again after its run, the
+        remaining nodes are handled as in write_nodes and every CSV file is
+        rewritten at the end.
+        """
+        return self._write_nodes(nodes, path_prefix, adapter_name, grouped=True)
+
+    def _write_nodes(self, nodes, path_prefix, adapter_name, grouped):
         self._temp_files.clear()
         self._node_headers.clear()
+        self._node_layouts.clear()
         node_freq = defaultdict(int)
-        output_dir = self.get_output_path(path_prefix, adapter_name)
+        # Resolved once; every per-label path below is a plain absolute string
+        output_dir = self.get_output_path(path_prefix, adapter_name).resolve().as_posix()
+        # Adapters reuse a handful of labels, so validate and normalise each once
+        label_cache = {}
+        # Grouped input only: CSV jobs started as soon as their label's run ended
+        early_jobs = {}
+        current_label = None
+        max_workers = os.cpu_count() or 1
+        executor = self._csv_executor(max_workers) if grouped and max_workers > 1 else None
         
         try:
             for node in nodes:
-                id, label, properties = node
-                if not self.check_node_label(label):
-                    raise ValueError(f"Invalid node label: {label}. This label is not defined in the schema configuration. Please check your adapter or schema config.")
+                id, raw_label, properties = node
+                label = label_cache.get(raw_label)
+                if label is None:
+                    if not self.check_node_label(raw_label):
+                        raise ValueError(f"Invalid node label: {raw_label}. This label is not defined in the schema configuration. Please check your adapter or schema config.")
+                    label = label_cache[raw_label] = sys.intern(raw_label.split(".")[-1].lower())
                 self.extract_node_info(node)
-                
-                if "." in label:
-                    label = label.split(".")[-1]
-                label = label.lower()
                 node_freq[label] += 1
+
+                if grouped and label is not current_label:
+                    if current_label is not None:
+                        self._node_writers.pop(current_label).close()
+                        early_jobs[current_label] = self._submit_csv_job(
+                            executor, self._node_csv_job(current_label, output_dir))
+                    if label in early_jobs:
+                        logger.warning(f"Nodes are not grouped by label ({label} came back after its run); "
+                                       f"writing all node CSV files at the end instead")
+                        grouped = False
+                        # Their temp files are about to be appended to again
+                        for future in early_jobs.values():
+                            future.result()
+                    current_label = label
                 
-                writer_key = self._init_node_writer(label, properties, path_prefix, adapter_name)
-                node_data = {'id': self.preprocess_id(id, label=label), **properties}
-                self.temp_buffer[label].append(node_data)
-                
-                if len(self.temp_buffer[label]) >= self.batch_size:
-                    self._write_buffer_to_temp(label, self.temp_buffer[label])
-            
-            for label in list(self.temp_buffer.keys()):
-                self._write_buffer_to_temp(label, self.temp_buffer[label])
-            
-            for label in self._node_headers.keys():
-                csv_file_path = output_dir / f"nodes_{label}.csv"
-                cypher_file_path = output_dir / f"nodes_{label}.cypher"
-                
-                if csv_file_path.exists():
-                    csv_file_path.unlink()
-                if cypher_file_path.exists():
-                    cypher_file_path.unlink()
-                
-                with open(csv_file_path, 'w', newline='') as csvfile:
-                    writer = csv.DictWriter(csvfile, fieldnames=sorted(self._node_headers[label]), 
-                                         delimiter=self.csv_delimiter, extrasaction='ignore')
-                    writer.writeheader()
-                    
-                    if label in self._temp_files and self._temp_files[label].exists():
-                        with open(self._temp_files[label], 'r') as temp_f:
-                            chunk = []
-                            for line in temp_f:
-                                chunk.append(json.loads(line))
-                                if len(chunk) >= self.batch_size:
-                                    for data in chunk:
-                                        writer.writerow({k: self.preprocess_value(v, k) for k, v in data.items()})
-                                    chunk.clear()
-                            
-                            for data in chunk:
-                                writer.writerow({k: self.preprocess_value(v, k) for k, v in data.items()})
-                
-                self.write_node_cypher(label, csv_file_path, cypher_file_path)
-                if label in self._temp_files and self._temp_files[label].exists():
-                    self._temp_files[label].unlink()                
+                temp_f = self._init_node_writer(label, output_dir)
+                layout = self._layout_index(self._node_layouts[label], self._node_headers[label], properties)
+                node_row = [layout, self.preprocess_id(id, label=label), *properties.values()]
+                temp_f.write(json.dumps(node_row) + '\n')
+
+            self._close_writers(self._node_writers)
+
+            # Early jobs must be done before a fallback rewrites the same files
+            array_columns = {f"{output_dir}/nodes_{label}.csv": future.result()
+                             for label, future in early_jobs.items()}
+            array_columns.update(self.write_csv_files([
+                self._node_csv_job(label, output_dir)
+                for label in self._node_headers
+                if not grouped or label not in early_jobs
+            ]))
+
+            for label in self._node_headers:
+                csv_file_path = f"{output_dir}/nodes_{label}.csv"
+                cypher_file_path = f"{output_dir}/nodes_{label}.cypher"
+                self.write_node_cypher(label, csv_file_path, cypher_file_path, array_columns[csv_file_path])
         finally:
-            self.temp_buffer.clear()
+            if executor is not None:
+                executor.shutdown()
+            self._close_writers(self._node_writers)
             for temp_file in self._temp_files.values():
-                if isinstance(temp_file, Path) and temp_file.exists():
-                    temp_file.unlink()
+                if os.path.exists(temp_file):
+                    os.unlink(temp_file)
             self._temp_files.clear()
                 
         return node_freq, self._node_headers
@@ -241,22 +699,24 @@ class Neo4jCSVWriter(BaseWriter):
 
 
     def write_edges(self, edges, path_prefix=None, adapter_name=None):
-        self.temp_buffer.clear()
         self._temp_files.clear()
         self._edge_headers.clear()
+        self._edge_layouts.clear()
         edge_freq = defaultdict(int)
-        output_dir = self.get_output_path(path_prefix, adapter_name)
+        output_dir = self.get_output_path(path_prefix, adapter_name).resolve().as_posix()
+        label_cache = {}
         
         try:
             for edge in edges:
-                source_id, target_id, label, properties = edge
-                if not self.check_edge_label(label):
-                    raise ValueError(f"Invalid edge label: {label}. This label is not defined in the schema configuration. Please check your adapter or schema config.")
+                source_id, target_id, raw_label, properties = edge
+                label = label_cache.get(raw_label)
+                if label is None:
+                    if not self.check_edge_label(raw_label):
+                        raise ValueError(f"Invalid edge label: {raw_label}. This label is not defined in the schema configuration. Please check your adapter or schema config.")
+                    label = label_cache[raw_label] = sys.intern(raw_label.lower())
                 # Extract edge info for counting (from BaseWriter)
                 self.extract_edge_info(edge)
                 
-                label = label.lower()
-                
                 edge_info = self.edge_node_types[label]
                 
                 if isinstance(source_id, tuple):
@@ -285,103 +745,82 @@ class Neo4jCSVWriter(BaseWriter):
 
                 edge_freq[f"{label}|{source_type}|{target_type}"] += 1
 
-                edge_label = edge_info.get("output_label") or label
-
-                edge_data = {
-                    'source_id': self.preprocess_id(source_id, label=source_type),
-                    'target_id': self.preprocess_id(target_id, label=target_type),
-                    'source_type': source_type,
-                    'target_type': target_type,
-                    'label': edge_label,
-                    **properties
-                }
-                
-                writer_key = self._init_edge_writer(label, source_type, target_type, properties, path_prefix, adapter_name)
-                self.temp_buffer[writer_key].append(edge_data)
-                
-                if len(self.temp_buffer[writer_key]) >= self.batch_size:
-                    self._write_buffer_to_temp(writer_key, self.temp_buffer[writer_key])
-        
-            for key in list(self.temp_buffer.keys()):
-                self._write_buffer_to_temp(key, self.temp_buffer[key])
-        
+                # label, source_type and target_type are fixed per key, so they
+                # are filled in when the CSV is written rather than spilled
+                key = (label, source_type, target_type)
+                temp_f = self._init_edge_writer(key, output_dir)
+                layout = self._layout_index(self._edge_layouts[key], self._edge_headers[key], properties)
+                edge_row = [
+                    layout,
+                    self.preprocess_id(source_id, label=source_type),
+                    self.preprocess_id(target_id, label=target_type),
+                    *properties.values(),
+                ]
+                temp_f.write(json.dumps(edge_row) + '\n')
+
+            self._close_writers(self._edge_writers)
+
+            csv_jobs = {}
+            cypher_jobs = []
             for key in self._edge_headers.keys():
                 input_label, source_type, target_type = key
                 edge_label = self.edge_node_types[input_label].get("output_label") or input_label 
             
                 file_suffix = f"{source_type}_{edge_label}_{target_type}".lower()
-                csv_file_path = output_dir / f"edges_{file_suffix}.csv"
-                cypher_file_path = output_dir / f"edges_{file_suffix}.cypher"
-            
-                if csv_file_path.exists():
-                    csv_file_path.unlink()
-                if cypher_file_path.exists():
-                    cypher_file_path.unlink()
-            
-                with open(csv_file_path, 'w', newline='') as csvfile:
-                    writer = csv.DictWriter(csvfile, fieldnames=sorted(self._edge_headers[key]), 
-                                     delimiter=self.csv_delimiter, extrasaction='ignore')
-                    writer.writeheader()
-                
-                    if key in self._temp_files and self._temp_files[key].exists():
-                        with open(self._temp_files[key], 'r') as temp_f:
-                            chunk = []
-                            for line in temp_f:
-                                chunk.append(json.loads(line))
-                                if len(chunk) >= self.batch_size:
-                                    for data in chunk:
-                                        writer.writerow({k: self.preprocess_value(v, k) for k, v in data.items()})
-                                    chunk.clear()
-                        
-                            for data in chunk:
-                                writer.writerow({k: self.preprocess_value(v, k) for k, v in data.items()})
-            
-                self.write_edge_cypher(edge_label, source_type, target_type, csv_file_path, cypher_file_path)
-                if key in self._temp_files and self._temp_files[key].exists():
-                    self._temp_files[key].unlink()
-            
+                csv_file_path = f"{output_dir}/edges_{file_suffix}.csv"
+                cypher_file_path = f"{output_dir}/edges_{file_suffix}.cypher"
+
+                # Keys that share an output file keep the last one written, as before
+                csv_jobs[csv_file_path] = (
+                    self._temp_files.get(key), csv_file_path, sorted(self._edge_headers[key]),
+                    ('source_id', 'target_id'), list(self._edge_layouts[key]),
+                    {'source_type': source_type, 'target_type': target_type, 'label': edge_label},
+                )
+                cypher_jobs.append((edge_label, source_type, target_type, csv_file_path, cypher_file_path))
+
+            array_columns = self.write_csv_files(list(csv_jobs.values()))
+
+            for edge_label, source_type, target_type, csv_file_path, cypher_file_path in cypher_jobs:
+                self.write_edge_cypher(edge_label, source_type, target_type, csv_file_path, cypher_file_path,
+                                       array_columns[csv_file_path])
+
         finally:
-            self.temp_buffer.clear()
+            self._close_writers(self._edge_writers)
             for temp_file in self._temp_files.values():
-                if isinstance(temp_file, Path) and temp_file.exists():
-                    temp_file.unlink()
+                if os.path.exists(temp_file):
+                    os.unlink(temp_file)
             self._temp_files.clear()
             
         return edge_freq
 
-    def write_node_cypher(self, label, csv_path, cypher_path):
-        absolute_path = csv_path.resolve().as_posix()
-    
-        cypher_query = f"""
-CREATE CONSTRAINT IF NOT EXISTS FOR (n:{label}) REQUIRE n.id IS UNIQUE;
-
-CALL apoc.periodic.iterate(
-    "LOAD CSV WITH HEADERS FROM 'file:///{absolute_path}' AS row FIELDTERMINATOR '{self.csv_delimiter}' RETURN row",
-    "MERGE (n:{label} {{id: row.id}})
-    SET n += apoc.map.removeKeys(row, ['id'])",
-    {{batchSize:1000, parallel:true, concurrency:4}}
-)
-YIELD batches, total
-RETURN batches, total;
-"""
+    def _array_assignments(self, var, array_columns):
+        """Cypher SET items turning the list-valued columns back into lists."""
+        return ''.join(
+            f", {var}.`{column}` = split(row.`{column}`, '{self.array_delimiter}')"
+            for column in array_columns or ()
+        )
+
+    def write_node_cypher(self, label, csv_path, cypher_path, array_columns=None):
+        """csv_path goes into the query as is, so it must be an absolute POSIX path."""
+        cypher_query = NODE_CYPHER_TEMPLATE.format(
+            label=label,
+            absolute_path=csv_path,
+            delimiter=self.csv_delimiter,
+            array_assignments=self._array_assignments('n', array_columns),
+        )
         with open(cypher_path, 'w') as f:
             f.write(cypher_query)
 
-    def write_edge_cypher(self, edge_label, source_type, target_type, csv_path, cypher_path):
-        absolute_path = csv_path.resolve().as_posix()
-    
-        cypher_query = f"""
-CALL apoc.periodic.iterate(
-    "LOAD CSV WITH HEADERS FROM 'file:///{absolute_path}' AS row FIELDTERMINATOR '{self.csv_delimiter}' RETURN row",
-    "MATCH (source:{source_type} {{id: row.source_id}})
-    MATCH (target:{target_type} {{id: row.target_id}})
-    MERGE (source)-[r:{edge_label}]->(target)
-    SET r += apoc.map.removeKeys(row, ['source_id', 'target_id', 'label', 'source_type', 'target_type'])",
-    {{batchSize:1000}}
-)
-YIELD batches, total
-RETURN batches, total;
-"""
+    def write_edge_cypher(self, edge_label, source_type, target_type, csv_path, cypher_path, array_columns=None):
+        """csv_path goes into the query as is, so it must be an absolute POSIX path."""
+        cypher_query = EDGE_CYPHER_TEMPLATE.format(
+            edge_label=edge_label,
+            source_type=source_type,
+            target_type=target_type,
+            absolute_path=csv_path,
+            delimiter=self.csv_delimiter,
+            array_assignments=self._array_assignments('r', array_columns),
+        )
         with open(cypher_path, 'w') as f:
             f.write(cypher_query)
 
@@ -650,6 +650,16 @@ def main(
         "are written without prefixes, though some ontology labels may still retain them.",
     ),
     buffer_size: int = typer.Option(10000, help="Buffer size for Parquet writer"),
+    overlap_io: bool = typer.Option(
+        False,
+        "--overlap-io",
+        help="Neo4j writer: write CSV blocks from a background thread while the next block is formatted",
+    ),
+    async_io: bool = typer.Option(
+        False,
+        "--async-io",
+        help="Neo4j writer: write per-label CSV files concurrently with asyncio instead of a process pool",
+    ),
     overwrite: bool = typer.Option(True, help="Overwrite existing Parquet files"),
     include_adapters: Optional[List[str]] = typer.Option(
         None,
@@ -746,6 +756,9 @@ def main(
                     if writer_type == "parquet":
                         bc.buffer_size = buffer_size
                         bc.overwrite = overwrite
+                    if writer_type == "neo4j":
+                        bc.overlap_io = overlap_io
+                        bc.async_io = async_io
 
                     schema_dict = preprocess_schema(sp_schema_config)
                     sp_adapters_dict = _load_adapters_config(sp_adapters_config, sp)
@@ -895,6 +908,9 @@ def main(
         if writer_type == "parquet":
             bc.buffer_size = buffer_size
             bc.overwrite = overwrite
+        if writer_type == "neo4j":
+            bc.overlap_io = overlap_io
+            bc.async_io = async_io
 
         schema_dict = preprocess_schema(schema_config)
         adapters_dict = _load_adapters_config(adapters_config, str(adapters_config))
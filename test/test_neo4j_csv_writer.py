@@ -0,0 +1,176 @@
+import csv
+import json
+
+import pytest
+
+import biocypher_metta
+from biocypher_metta.neo4j_csv_writer import Neo4jCSVWriter
+
+
+SCHEMA = {
+    "gene": {"represented_as": "node", "input_label": "gene"},
+    "transcript": {"represented_as": "node", "input_label": "transcript"},
+    "ontology term": {"represented_as": "node", "input_label": "ontology_term"},
+    "go": {"represented_as": "node", "input_label": "go", "is_a": "ontology term"},
+    "transcribed to": {
+        "represented_as": "edge",
+        "input_label": "transcribed_to",
+        "source": "gene",
+        "target": "transcript",
+    },
+}
+
+
+class StubOntologyMapping:
+    def _extend_schema(self):
+        return SCHEMA
+
+
+class StubBioCypher:
+    """Stands in for BioCypher so the writer can be built without schema files."""
+
+    def __init__(self, schema_config_path=None, biocypher_config_path=None):
+        pass
+
+    def _get_ontology_mapping(self):
+        return StubOntologyMapping()
+
+    def _get_ontology(self):
+        return None
+
+
+@pytest.fixture
+def make_writer(tmp_path, monkeypatch):
+    monkeypatch.setattr(biocypher_metta, "BioCypher", StubBioCypher)
+
+    def make(name="out", **kwargs):
+        return Neo4jCSVWriter("schema_config.yaml", "biocypher_config.yaml", tmp_path / name, **kwargs)
+
+    return make
+
+
+def read_csv(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f, delimiter="|"))
+
+
+def test_array_column_mixed_with_other_values_is_not_split(make_writer):
+    writer = make_writer()
+    writer.write_nodes([
+        ("g1", "gene", {"aliases": ["x", "y"], "synonyms": ["p", "q"], "xrefs": ["k"]}),
+        ("g2", "gene", {"aliases": "scalar", "synonyms": "", "xrefs": [["n"]]}),
+        ("g3", "gene", {"aliases": None, "synonyms": ["r"]}),
+    ])
+    output_dir = writer.get_output_path()
+
+    rows = read_csv(output_dir / "nodes_gene.csv")
+    # Only synonyms holds nothing but flat lists (or empty values)
+    assert [row["synonyms"] for row in rows] == ["p;q", "", "r"]
+    # The other two keep their lists as JSON, as nested lists always are
+    assert json.loads(rows[0]["aliases"]) == ["x", "y"]
+    assert [row["aliases"] for row in rows[1:]] == ["scalar", ""]
+    assert json.loads(rows[0]["xrefs"]) == ["k"]
+    assert rows[1]["xrefs"] == '["["n"]"]'
+
+    cypher = (output_dir / "nodes_gene.cypher").read_text()
+    assert "n.`synonyms` = split(row.`synonyms`, ';')" in cypher
+    assert "row.`aliases`, ';'" not in cypher
+    assert "row.`xrefs`, ';'" not in cypher
+
+
+def test_nested_list_with_big_int_and_nan_is_written_as_json(make_writer):
+    big = 2 ** 70
+    writer = make_writer()
+    writer.write_nodes([
+        ("g1", "gene", {"ranges": [[big, 1], [float("nan")]], "scores": [{"value": big}]}),
+    ])
+
+    rows = read_csv(writer.get_output_path() / "nodes_gene.csv")
+    assert rows[0]["ranges"] == f'["[{big}, 1]", "[NaN]"]'
+    assert rows[0]["scores"] == f'[{{"value": {big}}}]'
+
+
+def sample_nodes():
+    for i in range(60):
+        label = ("gene", "transcript", "go")[i % 3]
+        properties = {"name": f"node {i}", "score": i * 0.5}
+        if i % 2:
+            properties["aliases"] = [f"a{i}", i]
+        if i % 5 == 0:
+            properties["ranges"] = [[i, i + 1]]
+        yield (f"GO:{i:07d}" if label == "go" else f"ENSG:{i}", label, properties)
+
+
+def sample_edges():
+    for i in range(40):
+        yield (f"ENSG:{i}", f"ENST:{i}", "transcribed_to", {"weight": i, "evidence": ["IEA", "TAS"]})
+
+
+def read_outputs(writer):
+    """Map each output file name to its contents, with the output directory blanked out."""
+    output_dir = writer.get_output_path()
+    absolute = output_dir.resolve().as_posix()
+    return {path.name: path.read_text().replace(absolute, "<out>") for path in sorted(output_dir.iterdir())}
+
+
+@pytest.fixture(params=[1, 4], ids=["inline", "pool"])
+def cpus(request, monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: request.param)
+    return request.param
+
+
+@pytest.mark.parametrize("grouped", [True, False], ids=["sorted", "unsorted"])
+def test_write_nodes_sorted_matches_write_nodes(make_writer, cpus, grouped):
+    expected = make_writer("expected")
+    expected.write_nodes(sample_nodes())
+
+    nodes = list(sample_nodes())
+    if grouped:
+        nodes.sort(key=lambda node: node[1])
+    writer = make_writer("sorted")
+    node_freq, node_headers = writer.write_nodes_sorted(nodes)
+
+    assert node_freq == {"gene": 20, "transcript": 20, "go": 20}
+    assert node_headers["gene"] == {"id", "name", "score", "aliases", "ranges"}
+    if grouped:
+        assert read_outputs(writer) == read_outputs(expected)
+    else:
+        # Row order follows the input, so compare the rows as sets
+        outputs, expected_outputs = read_outputs(writer), read_outputs(expected)
+        assert outputs.keys() == expected_outputs.keys()
+        for name, text in outputs.items():
+            assert sorted(text.splitlines()) == sorted(expected_outputs[name].splitlines())
+    assert not any(name.startswith("temp_") for name in read_outputs(writer))
+
+
+@pytest.mark.parametrize("options", [{"overlap_io": True}, {"async_io": True}], ids=["overlap_io", "async_io"])
+def test_io_options_match_default_output(make_writer, cpus, options):
+    expected = make_writer("expected")
+    expected.write_nodes(sample_nodes())
+    expected.write_edges(sample_edges())
+
+    writer = make_writer("options", **options)
+    writer.write_nodes(sample_nodes())
+    writer.write_edges(sample_edges())
+
+    assert read_outputs(writer) == read_outputs(expected)
+
+
+def test_cypher_splits_flat_list_columns(make_writer):
+    writer = make_writer()
+    writer.write_nodes(sample_nodes())
+    writer.write_edges(sample_edges())
+    outputs = read_outputs(writer)
+
+    assert (
+        "SET n += apoc.map.removeKeys(row, ['id']), n.`aliases` = split(row.`aliases`, ';')\","
+        in outputs["nodes_gene.cypher"]
+    )
+    assert (
+        "SET r += apoc.map.removeKeys(row, ['source_id', 'target_id', 'label', 'source_type', 'target_type'])"
+        ", r.`evidence` = split(row.`evidence`, ';')\","
+        in outputs["edges_gene_transcribed_to_transcript.cypher"]
+    )
+    rows = read_csv(writer.get_output_path() / "nodes_gene.csv")
+    assert rows[0]["aliases"] == ""
+    assert rows[1]["aliases"] == "a3;3"